@@ -5,9 +5,11 @@ transient-failure retries, contract search + conid scoring, market data,
 and portfolio position fetching (with pagination).
 """
 
+import json
 import logging
+import os
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 import requests
 import urllib3
@@ -22,6 +24,7 @@ class IBKRClientPortalAPI:
     RETRY_BACKOFF_SECONDS = 1.0  # exponential: 1s, 2s, 4s, 8s, ...
     POSITIONS_PAGE_SIZE = 30
     POSITIONS_MAX_PAGES = 100
+    CONID_CACHE_TTL_SECONDS = 30 * 24 * 3600  # conids are stable for months
 
     def __init__(self, base_url: str = "https://localhost:5000/v1/api", timeout: int = 30):
         self.base_url = base_url
@@ -39,24 +42,37 @@ class IBKRClientPortalAPI:
         self.logger = logging.getLogger(__name__)
 
         self._conid_cache: Dict[str, str] = {}
+        self._conid_cached_at: Dict[str, float] = {}
+        # Failed lookups for this session only; never persisted, so a listing
+        # that appears later is picked up on the next run
+        self._conid_misses: Set[str] = set()
 
     # ------------------------------------------------------------------
     # HTTP layer
     # ------------------------------------------------------------------
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
-        """HTTP call with retry on connection errors / timeouts / 5xx. 4xx is not retried."""
+        """HTTP call with retry on connection errors / timeouts / 429 / 5xx. Other 4xx is not retried."""
         url = f"{self.base_url}{endpoint}"
         last_error = None
 
         for attempt in range(self.MAX_RETRIES):
+            delay = self.RETRY_BACKOFF_SECONDS * (2 ** attempt)
             try:
                 response = self.session.request(method, url, timeout=self.timeout, **kwargs)
 
                 if response.status_code == 200:
                     return response.json()
 
-                if 500 <= response.status_code < 600:
+                if response.status_code == 429:
+                    # Throttled (likely with concurrent lookups): back off, honouring Retry-After
+                    last_error = f"HTTP 429 - {response.text}"
+                    retry_after = response.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        delay = max(delay, int(retry_after))
+                    self.logger.warning(
+                        f"API {endpoint} throttled (429), retry {attempt + 1}/{self.MAX_RETRIES}")
+                elif 500 <= response.status_code < 600:
                     last_error = f"HTTP {response.status_code} - {response.text}"
                     self.logger.warning(
                         f"API {endpoint} returned {response.status_code}, "
@@ -78,7 +94,7 @@ class IBKRClientPortalAPI:
                 return None
 
             if attempt < self.MAX_RETRIES - 1:
-                time.sleep(self.RETRY_BACKOFF_SECONDS * (2 ** attempt))
+                time.sleep(delay)
 
         self.logger.error(f"API request failed after {self.MAX_RETRIES} attempts: {last_error}")
         if "ConnectionError" in (last_error or ""):
@@ -153,10 +169,17 @@ class IBKRClientPortalAPI:
         cache_key = f"{symbol}|{sec_type}|{exchange}|{currency}"
         if cache_key in self._conid_cache:
             return self._conid_cache[cache_key]
+        if cache_key in self._conid_misses:
+            return None
 
         contracts = self.search_contract(symbol, sec_type, exchange, currency)
+        if contracts is None:
+            # HTTP error, timeout or throttling: not cached, so the next lookup retries
+            self.logger.error(f"Contract search failed for {symbol}")
+            return None
         if not contracts:
             self.logger.error(f"No contract found for {symbol}")
+            self._conid_misses.add(cache_key)
             return None
 
         if len(contracts) == 1:
@@ -169,8 +192,56 @@ class IBKRClientPortalAPI:
 
         conid = str(best.get('conid'))
         self._conid_cache[cache_key] = conid
+        self._conid_cached_at[cache_key] = time.time()
         return conid
 
+    def load_conid_cache(self, path: str) -> int:
+        """Seed the conid cache from a JSON file written by `save_conid_cache`; skips expired entries."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable conid cache {path}: {e}")
+            return 0
+
+        if not isinstance(entries, dict):
+            self.logger.warning(f"Ignoring conid cache {path}: expected a JSON object")
+            return 0
+
+        cutoff = time.time() - self.CONID_CACHE_TTL_SECONDS
+        loaded = 0
+        for cache_key, entry in entries.items():
+            try:
+                conid, saved_at = entry
+                if saved_at < cutoff:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            self._conid_cache[cache_key] = conid
+            self._conid_cached_at[cache_key] = saved_at
+            loaded += 1
+        self.logger.info(f"Loaded {loaded} cached conid(s) from {path}")
+        return loaded
+
+    def save_conid_cache(self, path: str) -> None:
+        """Write the conid cache as `{cache_key: [conid, saved_at]}` JSON.
+
+        Written to a temp file and renamed over `path`, so an interrupted run
+        never leaves a truncated cache behind.
+        """
+        now = time.time()
+        entries = {k: [conid, self._conid_cached_at.get(k, now)]
+                   for k, conid in self._conid_cache.items()}
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not write conid cache {path}: {e}")
+
     # ------------------------------------------------------------------
     # Market data
     # ------------------------------------------------------------------
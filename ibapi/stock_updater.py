@@ -5,19 +5,26 @@ Updates an Excel workbook with:
   - current market prices (with last-close fallback via history endpoint)
 
 Usage: python stock_updater.py
+
+Large workbooks load and save noticeably faster with `lxml` installed;
+openpyxl picks it up automatically.
 """
 
 from __future__ import annotations
 
+import os
 import re
-import shutil
 import socket
 import subprocess
+import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, count, islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from urllib.parse import urlparse
 
 import openpyxl
@@ -35,7 +42,19 @@ class Config:
     default_sheet_name: str = "Stock"
     max_header_search_rows: int = 20
     max_end_marker_search_cols: int = 15
+    # Opt-in: stop scanning after this many blank rows following the last closed
+    # table. Any table further down is then skipped, so leave None unless the
+    # sheet's styled tail is large and no table sits below a long gap.
+    max_trailing_empty_rows: Optional[int] = None
     price_batch_size: int = 20
+    # Kept small: the gateway paces /iserver requests at roughly 10/s and
+    # answers excess ones with 429, which _make_request retries with backoff
+    contract_lookup_workers: int = 4
+    # Batches fetched concurrently; each may run its own contract lookups,
+    # so in-flight requests peak at price_batch_workers × contract_lookup_workers
+    price_batch_workers: int = 2
+    # Stored next to the workbook so repeat runs skip contract searches
+    conid_cache_file: str = ".conid_cache.json"
 
     gateway_bat: str = r"C:\projects\ibapi\bin\run.bat"
     gateway_conf: str = r"root\conf.yaml"
@@ -51,7 +70,7 @@ class Config:
     end_marker: str = "佔投資組合持股市值"
 
 
-@dataclass
+@dataclass(slots=True)
 class ColumnMapping:
     symbol: Optional[int] = None
     quantity: Optional[int] = None
@@ -70,7 +89,16 @@ class ColumnMapping:
         return missing
 
 
-@dataclass
+class RowJob(NamedTuple):
+    """One valid security row, read from the sheet once and shared by both updaters."""
+    row: int
+    symbol: str
+    key: str
+    stock_name: Optional[str]
+    current_qty: Any
+
+
+@dataclass(slots=True)
 class UpdateStatistics:
     qty_updated: int = 0
     qty_not_in_portfolio: int = 0
@@ -82,7 +110,7 @@ class UpdateStatistics:
     symbols_in_excel: set = field(default_factory=set)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ErrorRecord:
     row: int
     symbol: str
@@ -91,6 +119,19 @@ class ErrorRecord:
     error: Optional[str] = None
 
 
+class ErrorCategory(NamedTuple):
+    icon: str
+    title: str
+    show_market: bool = False
+    show_error: bool = False
+
+
+_CAT_NOT_IN_PORTFOLIO = ErrorCategory("❌", "NOT IN PORTFOLIO")
+_CAT_CONTRACT_NOT_FOUND = ErrorCategory("❌", "SYMBOL NOT FOUND", show_market=True)
+_CAT_NO_MARKET_DATA = ErrorCategory("⚠️ ", "NO PRICE DATA")
+_CAT_PRICE_FAILED = ErrorCategory("❌", "OTHER ERRORS", show_error=True)
+
+
 class ErrorTracker:
     def __init__(self):
         self.not_in_portfolio: List[ErrorRecord] = []
@@ -103,10 +144,34 @@ class ErrorTracker:
                     or self.no_market_data or self.price_failed)
 
 
+# ============================================================================
+# Console output
+# ============================================================================
+
+# Per-row progress lines are queued here and written once per table / batch.
+_console_lines: List[str] = []
+
+
+def _emit(line: str = "") -> None:
+    _console_lines.append(line)
+
+
+def _flush_console() -> None:
+    if _console_lines:
+        sys.stdout.write("\n".join(_console_lines) + "\n")
+        _console_lines.clear()
+
+
 # ============================================================================
 # Symbol & price utilities
 # ============================================================================
 
+# Chinese characters or forbidden punctuation disqualify a symbol cell
+_DISQUALIFYING_RE = re.compile(r'[\u4e00-\u9fff%$=:（）]')
+_DATE_SUFFIX_DMY_RE = re.compile(r'\s+\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$')
+_DATE_SUFFIX_YMD_RE = re.compile(r'\s+\d{4}[/-]\d{1,2}[/-]\d{1,2}$')
+
+
 class SymbolValidator:
     """Validates and normalizes security symbols pulled from Excel."""
 
@@ -114,68 +179,95 @@ class SymbolValidator:
     def is_valid_symbol(value, config: Config) -> bool:
         if not value:
             return False
+        # Numeric HK codes stored as numbers: no text to scan
+        if type(value) is int:
+            return value > 0
         text = str(value).strip()
         if not text or text == config.header_symbol:
             return False
-        # Skip Chinese characters
-        if any('一' <= c <= '鿿' for c in text):
+        # Plain tickers/codes (AAPL, 0700): str methods classify them in C
+        if text.isascii() and text.isalnum():
+            return True
+
+        if _DISQUALIFYING_RE.search(text):
             return False
         # Skip decimal-only numbers (0.15, 1.5)
         if '.' in text and text.replace('.', '').isdigit():
             return False
-        # Skip forbidden punctuation
-        if any(c in text for c in ('%', '$', '=', ':', '（', '）')):
-            return False
-        return any(c.isalpha() for c in text) or text.isdigit()
+        return any(map(str.isalpha, text)) or text.isdigit()
 
     @staticmethod
     def is_isin(symbol: str) -> bool:
+        """Expects an already-stripped symbol; cheap char checks run before the slice."""
         if not symbol or len(symbol) != 12:
             return False
-        s = str(symbol).strip()
-        return s[:2].isalpha() and s[-1].isdigit() and s[2:11].isalnum()
+        return (symbol[0].isalpha() and symbol[1].isalpha() and symbol[11].isdigit()
+                and symbol[2:11].isalnum())
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_symbol(symbol: str) -> str:
         """`BRK.B` → `BRK B`; `US-T 15/08/44` → `US-T`; upper-cased & stripped."""
         if not symbol:
             return ""
         n = str(symbol).strip().upper().replace('.', ' ')
-        n = re.sub(r'\s+\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$', '', n)
-        n = re.sub(r'\s+\d{4}[/-]\d{1,2}[/-]\d{1,2}$', '', n)
+        # Both date-suffix patterns need a '/' or '-' separator
+        if '/' in n or '-' in n:
+            n = _DATE_SUFFIX_DMY_RE.sub('', n)
+            n = _DATE_SUFFIX_YMD_RE.sub('', n)
         return n.strip()
 
 
+_HK_STOCK = ("STK", "SEHK", "HKD")
+_US_STOCK = ("STK", "SMART", "USD")
+_US_BOND = ("BOND", "SMART", "USD")
+
+
 class MarketDetector:
     """Guesses (sec_type, exchange, currency) from a bare symbol."""
 
     @staticmethod
+    @lru_cache(maxsize=8192)
     def detect(symbol: str) -> Tuple[str, str, str]:
         s = str(symbol).strip()
-        if SymbolValidator.is_isin(s):
-            return ("BOND", "SMART", "USD")
-        if any(c.isalpha() for c in s):
-            return ("STK", "SMART", "USD")
+        # All-digit codes can never be ISINs, so test the cheap HK case first
         if s.isdigit():
-            return ("STK", "SEHK", "HKD")
-        return ("STK", "SMART", "USD")
+            return _HK_STOCK
+        if SymbolValidator.is_isin(s):
+            return _US_BOND
+        return _US_STOCK
+
+
+# First characters float() can accept; anything else is a non-numeric sentinel
+_PRICE_START_CHARS = frozenset('0123456789+-.')
 
 
 class PriceUtils:
     @staticmethod
     def clean_price(value) -> Optional[float]:
-        """Strip IBKR quote-prefix letters (C=close, H=halted, etc.) and return float."""
+        """Strip IBKR quote-prefix letters (C=close, H=halted, etc.) and return float.
+
+        Returns None for anything unparseable; callers report it.
+        """
         if value is None:
             return None
+        kind = type(value)
+        if kind is float:
+            return value
+        if kind is int:
+            return float(value)
+        text = str(value)
+        if text[:1].isspace():
+            text = text.strip()
+        if text[:1].isalpha():
+            text = text[1:]
+        # Reject sentinels like 'N/A' or '' without paying for an exception
+        if not text or not (text[0] in _PRICE_START_CHARS or text[0].isalnum()
+                            or text[0].isspace()):
+            return None
         try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            text = str(value).strip()
-            if text and text[0].isalpha():
-                text = text[1:]
             return float(text)
-        except (TypeError, ValueError) as e:
-            print(f"Could not convert price value '{value}': {e}")
+        except ValueError:
             return None
 
 
@@ -184,10 +276,19 @@ class PriceUtils:
 # ============================================================================
 
 class WorksheetAnalyzer:
+    """Locates headers and tables from row-value tuples, so any openpyxl backend
+    (read-only, regular, or a pre-materialized list) can feed it."""
+
+    HEADER_SEARCH_COLS = 14
+
     def __init__(self, config: Config):
         self.config = config
 
-    def find_header_columns(self, ws) -> ColumnMapping:
+    def scan_width(self) -> int:
+        """Number of columns each row tuple must cover for both finders."""
+        return max(self.HEADER_SEARCH_COLS, self.config.max_end_marker_search_cols - 1)
+
+    def find_header_columns(self, rows: Iterable[Tuple]) -> ColumnMapping:
         cols = ColumnMapping()
         header_map = {
             self.config.header_symbol: 'symbol',
@@ -196,40 +297,49 @@ class WorksheetAnalyzer:
             self.config.header_avg_price: 'avg_price',
             self.config.header_name: 'name',
         }
-        for row in range(1, self.config.max_header_search_rows + 1):
-            for col in range(1, 15):
-                v = ws.cell(row, col).value
-                if v in header_map:
+        for values in islice(rows, self.config.max_header_search_rows):
+            for col, v in enumerate(values[:self.HEADER_SEARCH_COLS], 1):
+                if isinstance(v, str) and v in header_map:
                     setattr(cols, header_map[v], col)
-            if all([cols.symbol, cols.quantity, cols.price, cols.name]):
+            if cols.symbol and cols.quantity and cols.price and cols.name:
                 break
         return cols
 
-    def find_data_tables(self, ws, symbol_col: int) -> List[Tuple[int, int]]:
+    def find_data_tables(self, rows: Iterable[Tuple], symbol_col: int) -> List[Tuple[int, int]]:
         if symbol_col is None:
             raise ValueError(f"symbol column '{self.config.header_symbol}' was not found")
 
         tables = []
         current_start = None
-        for row in range(1, ws.max_row + 1):
-            cell = ws.cell(row, symbol_col).value
-            if cell and str(cell).strip() == self.config.header_symbol:
+        empty_run = 0
+        header = self.config.header_symbol
+        marker = self.config.end_marker
+        marker_cols = self.config.max_end_marker_search_cols - 1
+        max_empty = self.config.max_trailing_empty_rows
+        sym_idx = symbol_col - 1
+        for row, values in enumerate(rows, 1):
+            cell = values[sym_idx]
+            if isinstance(cell, str) and cell.strip() == header:
                 current_start = row
+                empty_run = 0
+                continue
+            if not current_start:
+                # Sheets often carry formatting far past the data; optionally don't walk it
+                if max_empty is not None and tables:
+                    empty_run = empty_run + 1 if values.count(None) == len(values) else 0
+                    if empty_run > max_empty:
+                        print(f"⚠️  Stopped scanning for tables at row {row} after {max_empty} "
+                              f"blank rows (max_trailing_empty_rows); any tables below are skipped")
+                        break
                 continue
-            if self._has_end_marker(ws, row) and current_start:
+            # One substring search over the row's text cells; NUL can't appear in the marker
+            if marker in "\0".join([v for v in values[:marker_cols] if isinstance(v, str)]):
                 end_row = row - 2
                 if end_row >= current_start:
                     tables.append((current_start, end_row))
                 current_start = None
         return tables
 
-    def _has_end_marker(self, ws, row: int) -> bool:
-        for col in range(1, self.config.max_end_marker_search_cols):
-            v = ws.cell(row, col).value
-            if v and self.config.end_marker in str(v):
-                return True
-        return False
-
 
 # ============================================================================
 # Portfolio
@@ -259,14 +369,8 @@ class PortfolioManager:
             return {}
         print(f"✅ Found {len(positions)} position(s)\n")
 
-        portfolio = {}
-        for pos in positions:
-            raw_ticker = pos.get('ticker') or ''
-            ticker = raw_ticker.strip().upper()
-            if not ticker:
-                continue
-            key = SymbolValidator.normalize_symbol(ticker)
-            portfolio[key] = {
+        portfolio = {
+            SymbolValidator.normalize_symbol(ticker): {
                 'quantity': pos.get('position', 0),
                 'avg_price': pos.get('avgPrice'),
                 'conid': str(pos.get('conid', '')),
@@ -274,7 +378,12 @@ class PortfolioManager:
                 'description': pos.get('contractDesc', ''),
                 'original_ticker': ticker,
             }
-            print(f"  • {ticker}: {portfolio[key]['quantity']} shares")
+            for pos in positions
+            if (ticker := (pos.get('ticker') or '').strip().upper())
+        }
+        if portfolio:
+            print("\n".join(f"  • {p['original_ticker']}: {p['quantity']} shares"
+                            for p in portfolio.values()))
         print()
         return portfolio
 
@@ -285,31 +394,32 @@ class PortfolioManager:
 
 class QuantityUpdater:
     @staticmethod
-    def update(ws, row: int, qty_col: int, symbol: str, portfolio: Dict,
-               stats: UpdateStatistics, errors: ErrorTracker,
-               stock_name: Optional[str], avg_price_col: Optional[int] = None):
-        key = SymbolValidator.normalize_symbol(symbol)
-
-        if key not in portfolio:
-            print(f"  ⚠️  Quantity: Not in portfolio (symbol '{symbol}' → '{key}')")
+    def update(job: RowJob, qty_col: int, portfolio: Dict, stats: UpdateStatistics,
+               errors: ErrorTracker, avg_price_col: Optional[int] = None
+               ) -> List[Tuple[int, int, Any]]:
+        """Return the (row, col, value) writes for this row; the caller applies them."""
+        pos = portfolio.get(job.key)
+        if pos is None:
+            _emit(f"  ⚠️  Quantity: Not in portfolio (symbol '{job.symbol}' → '{job.key}')")
             stats.qty_not_in_portfolio += 1
-            errors.not_in_portfolio.append(ErrorRecord(row, symbol, stock_name))
-            return
+            errors.not_in_portfolio.append(ErrorRecord(job.row, job.symbol, job.stock_name))
+            return []
 
-        old_qty = ws.cell(row, qty_col).value or 0
-        new_qty = portfolio[key]['quantity']
-        ws.cell(row, qty_col).value = new_qty
-        print(f"  ✅ Quantity: {new_qty}")
+        old_qty = job.current_qty or 0
+        new_qty = pos['quantity']
+        writes = [(job.row, qty_col, new_qty)]
+        _emit(f"  ✅ Quantity: {new_qty}")
         stats.qty_updated += 1
         if old_qty != new_qty:
-            stats.qty_changes.append((symbol, old_qty, new_qty))
+            stats.qty_changes.append((job.symbol, old_qty, new_qty))
 
         if avg_price_col is not None:
-            avg_price = portfolio[key].get('avg_price')
+            avg_price = pos.get('avg_price')
             if avg_price is not None:
-                ws.cell(row, avg_price_col).value = avg_price
-                print(f"  ✅ Avg Price: {avg_price:.2f}")
+                writes.append((job.row, avg_price_col, avg_price))
+                _emit(f"  ✅ Avg Price: {avg_price:.2f}")
                 stats.avg_price_updated += 1
+        return writes
 
 
 class PriceUpdater:
@@ -319,7 +429,7 @@ class PriceUpdater:
         self.api = api
         self.config = config
 
-    def batch_update(self, ws, targets: List[Tuple[int, str, Optional[str]]],
+    def batch_update(self, writes: List[Tuple[int, int, Any]], targets: List[RowJob],
                      portfolio: Dict, columns: ColumnMapping,
                      stats: UpdateStatistics, errors: ErrorTracker):
         if not targets:
@@ -328,71 +438,107 @@ class PriceUpdater:
         print(f"\n💹 Batch processing {len(targets)} price updates "
               f"(batch size: {self.config.price_batch_size})...")
 
-        for i in range(0, len(targets), self.config.price_batch_size):
-            batch = targets[i:i + self.config.price_batch_size]
-            batch_num = i // self.config.price_batch_size + 1
-            print(f"   Batch {batch_num}: {', '.join(s[1] for s in batch)[:60]}...")
-            self._process_batch(ws, batch, portfolio, columns, stats, errors)
-
-    def _process_batch(self, ws, batch, portfolio, columns, stats, errors):
-        conid_map = self._resolve_conids(batch, portfolio)
-        if conid_map:
-            self._fetch_and_apply(ws, conid_map, columns, stats, errors)
-        self._record_unresolved(batch, conid_map, stats, errors)
-
-    def _resolve_conids(self, batch, portfolio) -> Dict[str, Tuple]:
+        # key → (conid, currency) for positions whose contract IBKR already knows
+        portfolio_conids = {k: (p['conid'], p.get('currency', 'USD'))
+                            for k, p in portfolio.items() if p.get('conid')}
+
+        size = self.config.price_batch_size
+        batches = [targets[i:i + size] for i in range(0, len(targets), size)]
+
+        # Network round-trips overlap across batches; results are applied on this
+        # thread in batch order, so stats, errors and output need no locking.
+        workers = min(self.config.price_batch_workers, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fetched = pool.map(lambda b: self._fetch_batch(b, portfolio_conids), batches)
+            for batch_num, (batch, (conid_map, market_data)) in enumerate(
+                    zip(batches, fetched), 1):
+                _emit(f"   Batch {batch_num}: {', '.join(job.symbol for job in batch)[:60]}...")
+                try:
+                    if market_data:
+                        self._apply_batch(writes, conid_map, market_data, columns, stats, errors)
+                    self._record_unresolved(batch, conid_map, stats, errors)
+                finally:
+                    # Printed even if a row raised, so the failing row is visible
+                    _flush_console()
+
+    def _fetch_batch(self, batch, portfolio_conids) -> Tuple[Dict[str, Tuple], Optional[List[Dict]]]:
+        """Resolve a batch's conids and fetch its snapshot; touches no shared state."""
+        conid_map = self._resolve_conids(batch, portfolio_conids)
+        if not conid_map:
+            return conid_map, None
+        # Rows sharing a contract (e.g. `BRK.B` and `BRK B`) need only one quote
+        conids = list(dict.fromkeys(info[0] for info in conid_map.values()))
+        return conid_map, self.api.get_market_data_snapshot(conids, fields=["31", "72"])
+
+    def _resolve_conids(self, batch, portfolio_conids) -> Dict[str, Tuple]:
         """Map each Excel symbol → (conid, row, name, sec_type, exchange, currency, normalized)."""
         resolved = {}
-        for row, symbol, stock_name in batch:
-            key = SymbolValidator.normalize_symbol(symbol)
-
+        misses = []
+        for job in batch:
             # Portfolio hit — trust its conid
-            if key in portfolio and portfolio[key].get('conid'):
-                pos = portfolio[key]
-                resolved[symbol] = (pos['conid'], row, stock_name, "STK", "SMART",
-                                    pos.get('currency', 'USD'), key)
+            hit = portfolio_conids.get(job.key)
+            if hit is not None:
+                conid, currency = hit
+                resolved[job.symbol] = (conid, job.row, job.stock_name, "STK", "SMART",
+                                        currency, job.key)
                 continue
-
-            # Otherwise search IBKR
-            sec_type, exchange, currency = MarketDetector.detect(key)
-            conid = self.api.get_conid(key, sec_type, exchange, currency, stock_name)
+            resolved[job.symbol] = None  # keeps sheet order; filled or dropped below
+            misses.append((job,) + MarketDetector.detect(job.key))
+
+        if not misses:
+            return resolved
+
+        # Otherwise search IBKR; each lookup is a blocking round-trip, so overlap them
+        workers = min(self.config.contract_lookup_workers, len(misses))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            conids = list(pool.map(
+                lambda m: self.api.get_conid(m[0].key, m[1], m[2], m[3], m[0].stock_name),
+                misses))
+        for (job, sec_type, exchange, currency), conid in zip(misses, conids):
             if conid:
-                resolved[symbol] = (conid, row, stock_name, sec_type, exchange, currency, key)
+                resolved[job.symbol] = (conid, job.row, job.stock_name, sec_type, exchange,
+                                        currency, job.key)
+            else:
+                resolved.pop(job.symbol, None)
         return resolved
 
-    def _fetch_and_apply(self, ws, conid_map, columns, stats, errors):
-        conids = [info[0] for info in conid_map.values()]
-        market_data = self.api.get_market_data_snapshot(conids, fields=["31", "72"])
-        if not market_data:
-            return
-
+    def _apply_batch(self, writes, conid_map, market_data, columns, stats, errors):
+        # Join snapshot rows back to symbols by conid: one dict probe per symbol
         by_conid = {str(d.get('conid', '')): d for d in market_data}
         for symbol, (conid, row, stock_name, sec_type, exchange, currency, normalized) in conid_map.items():
             data = by_conid.get(conid)
             if data:
-                self._apply_price(ws, data, symbol, row, stock_name, exchange, currency,
-                                  normalized, columns, stats, errors)
+                self._apply_price(writes, data, conid, symbol, row, stock_name, exchange,
+                                  currency, normalized, columns, stats, errors)
 
-    def _apply_price(self, ws, data, symbol, row, stock_name, exchange, currency,
+    def _apply_price(self, writes, data, conid, symbol, row, stock_name, exchange, currency,
                      normalized, columns, stats, errors):
         raw = data.get('31') or data.get('72')
         source = "live"
         if raw is None:
-            raw = self._last_close_from_history(str(data.get('conid', '')))
+            raw = self._last_close_from_history(conid)
             source = "hist"
 
         if raw is None:
-            print(f"  ❌ {symbol}: No price data")
+            _emit(f"  ❌ {symbol}: No price data")
             stats.price_failed += 1
             errors.no_market_data.append(
                 ErrorRecord(row, symbol, stock_name, f"{exchange}/{currency}"))
             return
 
         price = PriceUtils.clean_price(raw)
-        ws.cell(row, columns.price).value = price
+        if price is None:
+            _emit(f"  ❌ {symbol}: Unparseable price '{raw}'")
+            stats.price_failed += 1
+            errors.price_failed.append(
+                ErrorRecord(row, symbol, stock_name, f"{exchange}/{currency}",
+                            f"Unparseable price '{raw}'"))
+            return
+
+        writes.append((row, columns.price, price))
         display = f"{symbol} ({normalized})" if normalized != symbol else symbol
         tag = "" if source == "live" else " [last close]"
-        print(f"  ✅ {display}: {currency} {price:.2f}{tag}")
+        _emit(f"  ✅ {display}: {currency} {price:.2f}{tag}")
         stats.price_updated += 1
 
     def _last_close_from_history(self, conid: str) -> Optional[float]:
@@ -403,16 +549,15 @@ class PriceUpdater:
         return bars[-1].get('c') if bars else None
 
     def _record_unresolved(self, batch, conid_map, stats, errors):
-        for row, symbol, stock_name in batch:
-            if symbol in conid_map:
+        for job in batch:
+            if job.symbol in conid_map:
                 continue
-            key = SymbolValidator.normalize_symbol(symbol)
-            _, exchange, currency = MarketDetector.detect(key)
-            display = f"{symbol} ({key})" if key != symbol else symbol
-            print(f"  ❌ {display}: Contract not found")
+            _, exchange, currency = MarketDetector.detect(job.key)
+            display = f"{job.symbol} ({job.key})" if job.key != job.symbol else job.symbol
+            _emit(f"  ❌ {display}: Contract not found")
             stats.price_failed += 1
             errors.contract_not_found.append(
-                ErrorRecord(row, symbol, stock_name, f"{exchange}/{currency}",
+                ErrorRecord(job.row, job.symbol, job.stock_name, f"{exchange}/{currency}",
                             "Failed to resolve contract ID"))
 
 
@@ -440,71 +585,71 @@ class ReportGenerator:
 
     @staticmethod
     def print_summary(stats: UpdateStatistics, portfolio: Dict):
-        print("=" * 80)
-        print("SUMMARY")
-        print("=" * 80)
+        _emit("=" * 80)
+        _emit("SUMMARY")
+        _emit("=" * 80)
 
         if stats.qty_updated:
-            print(f"\n📊 Quantities: {stats.qty_updated} updated")
+            _emit(f"\n📊 Quantities: {stats.qty_updated} updated")
             if stats.qty_changes:
-                print(f"   Changed: {len(stats.qty_changes)}")
+                _emit(f"   Changed: {len(stats.qty_changes)}")
                 for symbol, old, new in stats.qty_changes:
                     diff = new - old
                     sign = "+" if diff > 0 else ""
-                    print(f"      {symbol}: {old} → {new} ({sign}{diff})")
+                    _emit(f"      {symbol}: {old} → {new} ({sign}{diff})")
         if stats.qty_not_in_portfolio:
-            print(f"   Not in portfolio: {stats.qty_not_in_portfolio} (see details below)")
+            _emit(f"   Not in portfolio: {stats.qty_not_in_portfolio} (see details below)")
 
         if stats.avg_price_updated:
-            print(f"\n💵 Average Prices: {stats.avg_price_updated} updated")
+            _emit(f"\n💵 Average Prices: {stats.avg_price_updated} updated")
 
-        print(f"\n💰 Prices: {stats.price_updated} updated")
+        _emit(f"\n💰 Prices: {stats.price_updated} updated")
         if stats.price_failed:
-            print(f"   Failed: {stats.price_failed} (see details below)")
+            _emit(f"   Failed: {stats.price_failed} (see details below)")
 
         if stats.skipped:
-            print(f"\n⏭️  Skipped: {stats.skipped} invalid symbols")
+            _emit(f"\n⏭️  Skipped: {stats.skipped} invalid symbols")
 
         if portfolio:
-            print(f"\n📝 Portfolio: {len(portfolio)} positions")
-            missing = [(p['original_ticker'], p['quantity'])
-                       for k, p in portfolio.items() if k not in stats.symbols_in_excel]
+            _emit(f"\n📝 Portfolio: {len(portfolio)} positions")
+            missing = sorted((portfolio[k]['original_ticker'], portfolio[k]['quantity'])
+                             for k in portfolio.keys() - stats.symbols_in_excel)
             if missing:
-                print(f"\n⚠️  Positions NOT in Excel: {len(missing)}")
-                for ticker, qty in sorted(missing):
-                    print(f"      {ticker}: {qty} shares")
+                _emit(f"\n⚠️  Positions NOT in Excel: {len(missing)}")
+                for ticker, qty in missing:
+                    _emit(f"      {ticker}: {qty} shares")
             else:
-                print("   ✅ All portfolio positions are in Excel")
+                _emit("   ✅ All portfolio positions are in Excel")
+        _flush_console()
 
     @staticmethod
     def print_error_report(errors: ErrorTracker):
-        print("\n" + "=" * 80)
-        print("ISSUES FOUND")
-        print("=" * 80)
+        _emit("\n" + "=" * 80)
+        _emit("ISSUES FOUND")
+        _emit("=" * 80)
 
         if not errors.has_errors():
-            print("\n✅ No issues - all updates successful")
+            _emit("\n✅ No issues - all updates successful")
+            _flush_console()
             return
 
-        if errors.not_in_portfolio:
-            print(f"\n❌ NOT IN PORTFOLIO ({len(errors.not_in_portfolio)})")
-            for e in errors.not_in_portfolio:
-                print(f"      {e.symbol} (row {e.row})")
-
-        if errors.contract_not_found:
-            print(f"\n❌ SYMBOL NOT FOUND ({len(errors.contract_not_found)})")
-            for e in errors.contract_not_found:
-                print(f"      {e.symbol} at {e.market} (row {e.row})")
-
-        if errors.no_market_data:
-            print(f"\n⚠️  NO PRICE DATA ({len(errors.no_market_data)})")
-            for e in errors.no_market_data:
-                print(f"      {e.symbol} (row {e.row})")
-
-        if errors.price_failed:
-            print(f"\n❌ OTHER ERRORS ({len(errors.price_failed)})")
-            for e in errors.price_failed:
-                print(f"      {e.symbol}: {(e.error or '')[:50]} (row {e.row})")
+        for records, cat in (
+            (errors.not_in_portfolio, _CAT_NOT_IN_PORTFOLIO),
+            (errors.contract_not_found, _CAT_CONTRACT_NOT_FOUND),
+            (errors.no_market_data, _CAT_NO_MARKET_DATA),
+            (errors.price_failed, _CAT_PRICE_FAILED),
+        ):
+            if not records:
+                continue
+            _emit(f"\n{cat.icon} {cat.title} ({len(records)})")
+            for e in records:
+                if cat.show_error:
+                    _emit(f"      {e.symbol}: {(e.error or '')[:50]} (row {e.row})")
+                elif cat.show_market:
+                    _emit(f"      {e.symbol} at {e.market} (row {e.row})")
+                else:
+                    _emit(f"      {e.symbol} (row {e.row})")
+        _flush_console()
 
 
 # ============================================================================
@@ -515,14 +660,33 @@ class WorkbookManager:
     def __init__(self, config: Config):
         self.config = config
 
+    def open_for_scan(self, file_path: str):
+        """Streamed, cached-values view for header/table discovery. Never saved."""
+        try:
+            # Never saved, so external-link parts needn't be parsed and kept
+            wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True,
+                                        keep_links=False)
+            if self.config.default_sheet_name in wb.sheetnames:
+                ws = wb[self.config.default_sheet_name]
+                print(f"✅ Using sheet: '{self.config.default_sheet_name}'\n")
+            else:
+                ws = wb.active
+            # Stale <dimension> metadata would truncate the streamed rows
+            ws.reset_dimensions()
+            return wb, ws
+        except FileNotFoundError:
+            print(f"❌ File not found: {file_path}")
+            return None, None
+        except Exception as e:
+            print(f"❌ Error loading file: {e}")
+            return None, None
+
     def setup(self, file_path: str):
+        """Full (formula-preserving) load used for writing updates back."""
         try:
             wb = openpyxl.load_workbook(file_path)
-            wb.calculation.calcMode = 'auto'
-            wb.calculation.fullCalcOnLoad = True
             if self.config.default_sheet_name in wb.sheetnames:
                 wb.active = wb[self.config.default_sheet_name]
-                print(f"✅ Using sheet: '{self.config.default_sheet_name}'\n")
             return wb, wb.active
         except FileNotFoundError:
             print(f"❌ File not found: {file_path}")
@@ -532,44 +696,61 @@ class WorkbookManager:
             return None, None
 
     @staticmethod
-    def save(wb, file_path: str) -> bool:
-        print("=" * 80)
+    def save_async(wb, file_path: str) -> Future:
+        """Serialize the workbook on a worker thread; pair with `wait_for_save`.
+
+        Saves the full workbook. A write_only (or xlsxwriter) rewrite would
+        rebuild the sheet from values and lose styles, merged cells, charts
+        and the other sheets, so it is not an option here.
+        """
+        for sheet in wb.worksheets:
+            sheet.sheet_view.tabSelected = False
+        # openpyxl writes formulas without cached results; have Excel recompute on open
+        wb.calculation.calcMode = 'auto'
+        wb.calculation.fullCalcOnLoad = True
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(WorkbookManager._save_with_backup, wb, file_path)
+        executor.shutdown(wait=False)
+        return future
+
+    @staticmethod
+    def wait_for_save(future: Future) -> Optional[str]:
+        """Block until the save finishes; returns the backup path, or None on failure."""
+        print("\n" + "=" * 80)
         print("SAVING FILE")
         print("=" * 80 + "\n")
         try:
-            for sheet in wb.worksheets:
-                sheet.sheet_view.tabSelected = False
-            wb.save(file_path)
+            backup_path = future.result()
             print("✅ File saved successfully!\n")
-            return True
+            return backup_path
         except Exception as e:
             print(f"❌ Error saving: {e}")
-            return False
+            return None
 
     @staticmethod
-    def create_backup(file_path: str) -> Optional[str]:
-        """Skip if the file hasn't changed since the most recent backup."""
+    def _save_with_backup(wb, file_path: str) -> str:
+        """Save to a sibling temp file, then rotate original → backup and temp → original.
+
+        The original is never opened for writing, so it becomes the backup
+        without copying a byte. If any step fails, the original is moved back
+        into place and the temp file removed.
+        """
+        path = Path(file_path)
+        tmp_path = path.with_name(f"{path.stem}_saving{path.suffix}")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_path = path.parent / f"{path.stem}_backup_{timestamp}{path.suffix}"
+        backed_up = False
         try:
-            path = Path(file_path)
-            if not path.exists():
-                print(f"⚠️  File not found: {file_path}")
-                return None
-
-            file_mtime = path.stat().st_mtime
-            existing = sorted(path.parent.glob(f"{path.stem}_backup_*{path.suffix}"),
-                              key=lambda p: p.stat().st_mtime)
-            if existing and existing[-1].stat().st_mtime >= file_mtime:
-                print(f"⏭️  Backup skipped: file unchanged since {existing[-1].name}\n")
-                return str(existing[-1])
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = path.parent / f"{path.stem}_backup_{timestamp}{path.suffix}"
-            shutil.copy2(file_path, backup_path)
-            print(f"✅ Backup created: {backup_path.name}\n")
-            return str(backup_path)
-        except Exception as e:
-            print(f"❌ Failed to create backup: {e}")
-            return None
+            wb.save(tmp_path)
+            os.replace(path, backup_path)
+            backed_up = True
+            os.replace(tmp_path, path)
+        except BaseException:
+            if backed_up:
+                os.replace(backup_path, path)
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return str(backup_path)
 
 
 # ============================================================================
@@ -640,56 +821,87 @@ class AssetAllocationUpdater:
 
     def run(self, file_path: Optional[str] = None):
         file_path = file_path or self.config.excel_file_path
+        # Drop anything left queued by an earlier run that raised
+        _console_lines.clear()
 
         print("\n" + "=" * 80)
         print("📊 IBKR ASSET ALLOCATION UPDATER")
         print("=" * 80 + "\n")
         print(f"📂 File: {file_path}\n")
-        print("💾 Creating backup...")
-
-        backup_path = self.workbook_manager.create_backup(file_path)
-        if not backup_path:
-            print("❌ Cannot proceed without backup. Exiting.")
-            return
 
         if not self._authenticate():
             return
 
+        # The full load is the slowest step; overlap it with the portfolio
+        # fetch and the read-only layout scan.
+        loader = ThreadPoolExecutor(max_workers=1)
+        wb_future = loader.submit(self.workbook_manager.setup, file_path)
+        loader.shutdown(wait=False)
+
         portfolio = self.portfolio_manager.fetch()
+        layout = self._scan_layout(file_path)
 
-        wb, ws = self.workbook_manager.setup(file_path)
+        wb, ws = wb_future.result()
         if not wb:
             return
+        if not layout:
+            wb.close()
+            return
+        columns, tables = layout
+
+        try:
+            stats = UpdateStatistics()
+            errors = ErrorTracker()
+            conid_cache = str(Path(file_path).with_name(self.config.conid_cache_file))
+            self.api.load_conid_cache(conid_cache)
+            self._process_tables(ws, tables, columns, portfolio, stats, errors)
+            self.api.save_conid_cache(conid_cache)
+
+            # The reports never touch `wb`, so print them while it serializes.
+            save_future = self.workbook_manager.save_async(wb, file_path)
+            try:
+                ReportGenerator.print_summary(stats, portfolio)
+                ReportGenerator.print_error_report(errors)
+            finally:
+                backup_path = self.workbook_manager.wait_for_save(save_future)
+
+            if backup_path:
+                print(f"💾 Backup saved at: {backup_path}")
+        finally:
+            wb.close()
+
+    def _scan_layout(self, file_path: str) -> Optional[Tuple[ColumnMapping, List[Tuple[int, int]]]]:
+        """Find the header columns and data tables from a read-only view of the sheet."""
+        scan_wb, scan_ws = self.workbook_manager.open_for_scan(file_path)
+        if not scan_wb:
+            return None
 
+        # One streamed pass feeds both finders: the header rows are buffered and
+        # replayed, the rest is parsed lazily so an opt-in cutoff can stop the scan early
         try:
-            columns = self.worksheet_analyzer.find_header_columns(ws)
+            rows = scan_ws.iter_rows(min_row=1, max_col=self.worksheet_analyzer.scan_width(),
+                                     values_only=True)
+            head = list(islice(rows, self.config.max_header_search_rows))
+
+            columns = self.worksheet_analyzer.find_header_columns(head)
             missing = columns.missing_required(self.config)
             if missing:
                 self._print_missing_columns(missing)
-                return
+                return None
 
             ReportGenerator.print_column_mapping(columns, self.config)
 
-            tables = self.worksheet_analyzer.find_data_tables(ws, columns.symbol)
-            if not tables:
-                print("\n❌ No data tables found")
-                return
-
-            print(f"\n✅ Found {len(tables)} data table(s)")
-            for i, (start, end) in enumerate(tables, 1):
-                print(f"   Table {i}: Rows {start + 1} to {end}")
-
-            stats = UpdateStatistics()
-            errors = ErrorTracker()
-            self._process_tables(ws, tables, columns, portfolio, stats, errors)
-
-            self.workbook_manager.save(wb, file_path)
-            ReportGenerator.print_summary(stats, portfolio)
-            ReportGenerator.print_error_report(errors)
-
-            print(f"\n💾 Backup saved at: {backup_path}")
+            tables = self.worksheet_analyzer.find_data_tables(chain(head, rows), columns.symbol)
         finally:
-            wb.close()
+            scan_wb.close()
+        if not tables:
+            print("\n❌ No data tables found")
+            return None
+
+        print(f"\n✅ Found {len(tables)} data table(s)")
+        for i, (start, end) in enumerate(tables, 1):
+            print(f"   Table {i}: Rows {start + 1} to {end}")
+        return columns, tables
 
     def _authenticate(self) -> bool:
         if not self.gateway_launcher.ensure_running():
@@ -732,41 +944,69 @@ class AssetAllocationUpdater:
         print("UPDATING POSITIONS")
         print("=" * 80 + "\n")
 
-        price_targets: List[Tuple[int, str, Optional[str]]] = []
+        price_targets: List[RowJob] = []
+        # (row, col, value) cell updates from both phases, applied together at the end
+        writes: List[Tuple[int, int, Any]] = []
+        sym_col = columns.symbol
+        qty_col = columns.quantity
+        price_col = columns.price
+        avg_price_col = columns.avg_price
+        name_col = columns.name
 
         for table_num, (start_row, end_row) in enumerate(tables, 1):
-            print(f"📋 Table {table_num}:\n")
-            for row in range(start_row + 1, end_row + 1):
-                symbol_value = ws.cell(row, columns.symbol).value
-                if not SymbolValidator.is_valid_symbol(symbol_value, self.config):
-                    if symbol_value:
-                        stats.skipped += 1
-                    continue
-
-                symbol = str(symbol_value).strip().upper()
-                stock_name = self._stock_name(ws, row, columns)
-                stats.symbols_in_excel.add(SymbolValidator.normalize_symbol(symbol))
-
-                print(f"Row {row}: {symbol}")
-
-                if columns.quantity:
-                    QuantityUpdater.update(ws, row, columns.quantity, symbol, portfolio,
-                                           stats, errors, stock_name, columns.avg_price)
-
-                if columns.price:
-                    price_targets.append((row, symbol, stock_name))
-
-                print()
-
-        if columns.price and price_targets:
-            self.price_updater.batch_update(ws, price_targets, portfolio, columns, stats, errors)
+            _emit(f"📋 Table {table_num}:\n")
+            table_jobs: List[RowJob] = []
+            try:
+                # Read the needed columns up front; the loop below only writes cells.
+                # Whole-row reads would create a Cell for every blank in between.
+                symbols, names, quantities = (
+                    self._column_values(ws, col, start_row + 1, end_row)
+                    for col in (sym_col, name_col, qty_col))
+                for row, symbol_value, name_value, current_qty in zip(
+                        count(start_row + 1), symbols, names, quantities):
+                    if not SymbolValidator.is_valid_symbol(symbol_value, self.config):
+                        if symbol_value:
+                            stats.skipped += 1
+                        continue
+
+                    symbol = str(symbol_value).strip().upper()
+                    # Plain tickers (AAPL, 700) are already in portfolio-key form
+                    key = symbol if symbol.isalnum() else SymbolValidator.normalize_symbol(symbol)
+                    job = RowJob(row, symbol, key,
+                                 str(name_value).strip() if name_value else None, current_qty)
+                    table_jobs.append(job)
+
+                    _emit(f"Row {row}: {symbol}")
+
+                    if qty_col:
+                        writes.extend(QuantityUpdater.update(job, qty_col, portfolio, stats,
+                                                             errors, avg_price_col))
+
+                    _emit()
+            finally:
+                # Printed even if a row raised, so the failing row is visible
+                _flush_console()
+
+            stats.symbols_in_excel.update([job.key for job in table_jobs])
+            if price_col:
+                price_targets.extend(table_jobs)
+
+        if price_col and price_targets:
+            self.price_updater.batch_update(writes, price_targets, portfolio, columns, stats, errors)
+
+        # openpyxl keys cells by (row, col) in a dict, so write order doesn't
+        # matter; list order keeps the last write to a cell winning
+        cell = ws.cell
+        for row, col, value in writes:
+            cell(row, col).value = value
 
     @staticmethod
-    def _stock_name(ws, row: int, columns: ColumnMapping) -> Optional[str]:
-        if not columns.name:
-            return None
-        v = ws.cell(row, columns.name).value
-        return str(v).strip() if v else None
+    def _column_values(ws, col: Optional[int], min_row: int, max_row: int) -> Tuple:
+        """Values of one column over a row range; all None when the column is absent."""
+        if not col:
+            return (None,) * (max_row - min_row + 1)
+        return next(ws.iter_cols(min_col=col, max_col=col, min_row=min_row, max_row=max_row,
+                                 values_only=True))
 
 
 def update_asset_allocation(file_path: Optional[str] = None) -> None:
@@ -9,9 +9,16 @@ Each item can only be selected once (0/1 property).
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import time
-import random
+from bisect import bisect_right
+
+# knapsack_dp switches to meet-in-the-middle for at most this many items (its subset
+# lists grow as 2^(n/2)) when that is cheaper than the O(n * capacity) DP row updates
+MITM_MAX_ITEMS = 40
+# Measured: building and merging one half-subset costs about as much as this many DP cells
+MITM_SUBSET_COST_CELLS = 1000
+# ...or when the DP's row and decision table would need more memory than this
+DP_MAX_BYTES = 2 * 1024**3
 
 
 def knapsack_dp(values, weights, capacity, return_items=False):
@@ -38,7 +45,81 @@ def knapsack_dp(values, weights, capacity, return_items=False):
     """
     n = len(values)
 
-    # Initialize DP table with zeros
+    if n <= MITM_MAX_ITEMS:
+        half = n // 2
+        mitm_cost = (2 ** half + 2 ** (n - half)) * MITM_SUBSET_COST_CELLS
+        # int64 row plus its shifted candidate, and one bit per cell to backtrack
+        dp_bytes = 16 * (capacity + 1) + (n * (capacity + 1) // 8 if return_items else 0)
+        if mitm_cost < n * (capacity + 1) or dp_bytes > DP_MAX_BYTES:
+            return knapsack_meet_in_middle(values, weights, capacity, return_items)
+
+    kind = np.asarray(values).dtype.kind if n else 'i'
+    if kind == 'f':
+        dtype = np.float64
+    elif kind in 'biu':
+        # No dp entry can exceed the total of all values; when that fits in int32,
+        # the row is half the bytes and twice as many lanes per vector op
+        total = sum(abs(int(v)) for v in values)
+        if total < 2**31:
+            dtype = np.int32
+        elif total < 2**63:
+            dtype = np.int64
+        else:
+            return _knapsack_dp_python(values, weights, capacity, return_items)
+    else:
+        # Fraction, Decimal, ints beyond int64, ...: numpy would hold them as objects
+        return _knapsack_dp_python(values, weights, capacity, return_items)
+    # Plain Python scalars are "weak" in numpy promotion, so adding one never widens
+    # the row (a np.uint64 value would turn an int32 row into float64)
+    item_values = np.asarray(values).astype(dtype).tolist()
+
+    if not return_items:
+        # Only the last row is needed: keep a single row and update it one item at a
+        # time. The right-hand side is computed from the previous row before the
+        # in-place max, so each item is still taken at most once.
+        dp = np.zeros(capacity + 1, dtype=dtype)
+        for weight, value in zip(weights, item_values):
+            if weight <= capacity:
+                np.maximum(dp[weight:], dp[:capacity + 1 - weight] + value, out=dp[weight:])
+        return dp[capacity].item()
+
+    # Same single-row update, plus one bit per (item, capacity) recording whether
+    # taking the item improved dp[w] -- exactly when dp[i][w] != dp[i-1][w] in the
+    # full table, which is all backtracking needs. Packed 8 per byte, this is 64x
+    # smaller than keeping every row of int64 values.
+    dp = np.zeros(capacity + 1, dtype=dtype)
+    took = np.zeros((n, (capacity + 8) // 8), dtype=np.uint8)
+    taken = np.zeros(capacity + 1, dtype=bool)
+    for i, (weight, value) in enumerate(zip(weights, item_values)):
+        if weight > capacity:
+            continue
+        candidate = dp[:capacity + 1 - weight] + value
+        taken[:weight] = False
+        np.greater(candidate, dp[weight:], out=taken[weight:])
+        np.maximum(dp[weight:], candidate, out=dp[weight:])
+        took[i] = np.packbits(taken)
+
+    max_value = dp[capacity].item()
+
+    # Reconstruct the solution (which items are selected)
+    selected_items = []
+    w = capacity
+    for i in range(n - 1, -1, -1):
+        # If item i was taken at this capacity
+        if took[i, w >> 3] >> (7 - (w & 7)) & 1:
+            selected_items.append(i)
+            w -= weights[i]
+
+    # Reverse to get items in original order
+    selected_items.reverse()
+
+    return max_value, selected_items
+
+
+def _knapsack_dp_python(values, weights, capacity, return_items=False):
+    """Full-table DP in plain Python, for values numpy cannot hold in a numeric row."""
+    n = len(values)
+
     # dp[i][w] represents the maximum value that can be obtained using first i items
     # and with a maximum weight capacity of w
     dp = [[0 for _ in range(capacity + 1)] for _ in range(n + 1)]
@@ -73,52 +154,173 @@ def knapsack_dp(values, weights, capacity, return_items=False):
     return max_value, selected_items
 
 
-def knapsack_recursive(values, weights, capacity, n=None, memo=None):
+def knapsack_meet_in_middle(values, weights, capacity, return_items=False):
     """
-    Solve the 0/1 knapsack problem using recursive approach with memoization.
+    Solve the 0/1 knapsack problem by meet-in-the-middle.
+
+    Runs in O(2^(n/2) * n) time independent of the capacity, so it handles a
+    few dozen items with capacities far too large for the DP table.
 
     Args:
         values: List of values for each item
         weights: List of weights for each item
         capacity: Maximum weight capacity of the knapsack
-        n: Number of items to consider (defaults to len(values))
-        memo: Memoization dictionary
+        return_items: If True, returns selected items; if False, returns only max value
 
     Returns:
-        Maximum value that can be obtained
+        int or tuple: Maximum value, or (maximum value, selected items) if return_items=True
     """
-    if n is None:
-        n = len(values)
+    n = len(values)
+    half = n // 2
+
+    def subsets(indices):
+        # (weight, value, item bitmask) for every subset of `indices` that fits
+        found = [(0, 0, 0)]
+        for i in indices:
+            weight, value, bit = weights[i], values[i], 1 << i
+            found += [(w + weight, v + value, mask | bit)
+                      for w, v, mask in found if w + weight <= capacity]
+        return found
+
+    # Sort the first half by weight (best value first on ties) and keep only the
+    # subsets worth more than every lighter one; values then rise with weight, so the
+    # best partner for any second-half subset is the heaviest one that still fits
+    frontier = []
+    for w, v, mask in sorted(subsets(range(half)), key=lambda s: (s[0], -s[1])):
+        if not frontier or v > frontier[-1][1]:
+            frontier.append((w, v, mask))
+    frontier_weights = [w for w, _, _ in frontier]
+
+    max_value, best_mask = 0, 0
+    for w, v, mask in subsets(range(half, n)):
+        partner = frontier[bisect_right(frontier_weights, capacity - w) - 1]
+        if v + partner[1] > max_value:
+            max_value, best_mask = v + partner[1], mask | partner[2]
 
-    # Initialize memoization dictionary
-    if memo is None:
-        memo = {}
+    if not return_items:
+        return max_value
 
-    # Base case: no items or no capacity
-    if n == 0 or capacity == 0:
-        return 0
+    return max_value, [i for i in range(n) if best_mask >> i & 1]
 
-    # Check if result is already memoized
-    if (n, capacity) in memo:
-        return memo[(n, capacity)]
 
-    # If weight of nth item is more than capacity, skip it
-    if weights[n - 1] > capacity:
-        result = knapsack_recursive(values, weights, capacity, n - 1, memo)
-    else:
-        # Return max of two cases:
-        # 1. nth item is included
-        # 2. nth item is not included
-        include = values[n - 1] + knapsack_recursive(values, weights, capacity - weights[n - 1], n - 1, memo)
-        exclude = knapsack_recursive(values, weights, capacity, n - 1, memo)
-        result = max(include, exclude)
+def knapsack_branch_and_bound(values, weights, capacity, return_items=False):
+    """
+    Solve the 0/1 knapsack problem by depth-first branch and bound.
 
-    # Memoize the result
-    memo[(n, capacity)] = result
-    return result
+    Items are explored in order of value density, and a branch is pruned when
+    even the fractional (LP-relaxation) fill of the remaining capacity cannot
+    beat the best solution found so far. Exponential in the worst case, but it
+    usually visits a tiny part of the tree and needs no O(n * capacity) table.
+    Not used by knapsack_dp: when the fractional bound is loose (e.g. equal
+    value/weight ratios) nothing is pruned, so call it explicitly for inputs
+    known to prune well.
 
+    Args:
+        values: List of values for each item
+        weights: List of weights for each item
+        capacity: Maximum weight capacity of the knapsack
+        return_items: If True, returns selected items; if False, returns only max value
+
+    Returns:
+        int or tuple: Maximum value, or (maximum value, selected items) if return_items=True
+    """
+    # Weightless items with positive value are always taken; items that are worthless
+    # or can never fit are dropped; the rest are searched best value density first
+    base_value, base_mask = 0, 0
+    order = []
+    for i, (value, weight) in enumerate(zip(values, weights)):
+        if value <= 0 or weight > capacity:
+            continue
+        if weight == 0:
+            base_value += value
+            base_mask |= 1 << i
+        else:
+            order.append(i)
+    order.sort(key=lambda i: values[i] / weights[i], reverse=True)
+    m = len(order)
+
+    def upper_bound(k, room, value):
+        # Greedily fill `room` from order[k:], taking a fraction of the first misfit
+        for i in order[k:]:
+            if weights[i] > room:
+                return value + values[i] * room / weights[i]
+            room -= weights[i]
+            value += values[i]
+        return value
+
+    max_value, best_mask = base_value, base_mask
+    # Explicit stack instead of recursion: (next position in order, room left, value, items)
+    stack = [(0, capacity, base_value, base_mask)]
+    while stack:
+        k, room, value, mask = stack.pop()
+        if value > max_value:
+            max_value, best_mask = value, mask
+        if k == m or upper_bound(k, room, value) <= max_value:
+            continue
+        i = order[k]
+        # Pushed last so taking the item is explored first
+        stack.append((k + 1, room, value, mask))
+        if weights[i] <= room:
+            stack.append((k + 1, room - weights[i], value + values[i], mask | 1 << i))
+
+    if not return_items:
+        return max_value
+
+    return max_value, [i for i in range(len(values)) if best_mask >> i & 1]
+
+
+def knapsack_recursive(values, weights, capacity, n=None):
+    """
+    Solve the 0/1 knapsack problem using recursive approach with memoization.
+
+    Args:
+        values: List of values for each item
+        weights: List of weights for each item
+        capacity: Maximum weight capacity of the knapsack
+        n: Number of items to consider (defaults to len(values))
 
-def visualize_knapsack_solution(values, weights, capacity, selected):
+    Returns:
+        Maximum value that can be obtained
+    """
+    if n is None:
+        n = len(values)
+
+    # Memo keyed by a flat int: n never exceeds len(values), so capacity * stride + n is
+    # unique and needs no tuple allocation; values/weights/memo come from the closure
+    # rather than being passed down on every call
+    memo = {}
+    stride = len(values) + 1
+
+    def best(n, capacity):
+        # Base case: no items or no capacity
+        if n == 0 or capacity == 0:
+            return 0
+
+        key = capacity * stride + n
+        result = memo.get(key)
+        if result is not None:
+            return result
+
+        weight = weights[n - 1]
+        # If weight of nth item is more than capacity, skip it
+        if weight > capacity:
+            result = best(n - 1, capacity)
+        else:
+            # Return max of two cases:
+            # 1. nth item is included
+            # 2. nth item is not included
+            result = best(n - 1, capacity)
+            include = values[n - 1] + best(n - 1, capacity - weight)
+            if include > result:
+                result = include
+
+        memo[key] = result
+        return result
+
+    return best(n, capacity)
+
+
+def visualize_knapsack_solution(values, weights, capacity, selected, seed=None):
     """
     Visualize the knapsack problem solution.
 
@@ -127,17 +329,23 @@ def visualize_knapsack_solution(values, weights, capacity, selected):
         weights: List of weights for each item
         capacity: Maximum weight capacity
         selected: List of selected item indices
+        seed: Random seed for reproducible item positions
     """
+    # Imported here so solving a knapsack does not pay matplotlib's import time
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
     # Plot all items as circles with sizes proportional to weights
     # and colors based on values
-    all_x = np.random.rand(len(weights))
-    all_y = np.random.rand(len(weights))
+    all_x, all_y = np.random.default_rng(seed).random((2, len(weights)))
 
-    # Normalize for visualization
-    sizes = [50 + 500 * (w / max(weights)) for w in weights]
-    colors = [plt.cm.viridis(v / max(values)) for v in values]
+    # Normalize for visualization; the colormap maps a whole array in one call,
+    # one RGBA row per item
+    weights_arr = np.asarray(weights, dtype=np.float64)
+    values_arr = np.asarray(values, dtype=np.float64)
+    sizes = 50.0 + 500.0 * (weights_arr / weights_arr.max())
+    colors = plt.cm.viridis(values_arr / values_arr.max())
 
     # Plot all items
     ax1.scatter(all_x, all_y, s=sizes, c=colors, alpha=0.6)
@@ -155,10 +363,11 @@ def visualize_knapsack_solution(values, weights, capacity, selected):
     ax1.grid(True, linestyle='--', alpha=0.7)
 
     # Plot selected items and knapsack
-    selected_x = [all_x[i] for i in selected]
-    selected_y = [all_y[i] for i in selected]
-    selected_sizes = [sizes[i] for i in selected]
-    selected_colors = [colors[i] for i in selected]
+    picked = np.asarray(selected, dtype=np.intp)
+    selected_x = all_x[picked]
+    selected_y = all_y[picked]
+    selected_sizes = sizes[picked]
+    selected_colors = colors[picked]
 
     # Draw knapsack as a rectangle
     knapsack = plt.Rectangle((0.1, 0.1), 0.8, 0.8, fill=False, edgecolor='black',
@@ -201,11 +410,10 @@ def generate_random_items(n, max_weight=100, max_value=100, seed=None):
     Returns:
         Tuple of (values, weights)
     """
-    if seed is not None:
-        random.seed(seed)
-
-    weights = [random.randint(1, max_weight) for _ in range(n)]
-    values = [random.randint(1, max_value) for _ in range(n)]
+    # Draw each list in one call; tolist() keeps plain Python ints for the solvers
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, max_weight + 1, size=n).tolist()
+    values = rng.integers(1, max_value + 1, size=n).tolist()
 
     return values, weights
 
@@ -291,7 +499,7 @@ def main():
 
     # Visualize the solution
     print("\nGenerating visualization...")
-    visualize_knapsack_solution(values, weights, knapsack_capacity, results['dp']['items'])
+    visualize_knapsack_solution(values, weights, knapsack_capacity, results['dp']['items'], seed=42)
 
 
 # Example usage and testing
@@ -9,11 +9,14 @@ LCS finds the longest subsequence that is present in two sequences in the same r
 The module provides the following functions:
 - lcs_length: Computes the length of the LCS between two sequences
 - lcs_string: Computes and returns the actual LCS between two sequences
+- lcs_hunt_szymanski: Computes the LCS in time driven by the number of matching pairs
 - lcs_with_traceback: Computes the LCS and provides a traceback for visualization
 - print_lcs_traceback: Prints a visual representation of the LCS traceback
 
 Time Complexity: O(m*n) where m and n are the lengths of the two sequences
-Space Complexity: O(m*n) for the dynamic programming table
+(lcs_length processes a whole DP row per element with bit-parallel integer operations)
+Space Complexity: O(m*n) for the dynamic programming table (lcs_length keeps one
+max(m, n)-bit mask per distinct element instead)
 
 References:
 - Introduction to Algorithms by Cormen, Leiserson, Rivest, and Stein
@@ -23,10 +26,15 @@ Author: AI Assistant
 Date: 2025-06-14
 """
 
+from bisect import bisect_left
+from collections import Counter
 from typing import List, TypeVar, Sequence, Union, Optional, Tuple
 
 T = TypeVar('T')  # Generic type for sequence elements
 
+# lcs_string uses Hunt-Szymanski when fewer than 1 in this many (i, j) pairs match
+SPARSE_MATCH_RATIO = 10
+
 
 def lcs_length(X: Sequence[T], Y: Sequence[T]) -> int:
     """
@@ -46,25 +54,114 @@ def lcs_length(X: Sequence[T], Y: Sequence[T]) -> int:
         >>> lcs_length("ABCBDAB", "BDCABA")
         4  # The LCS is "BCBA" with length 4
     """
-    # Get sequence lengths
-    m = len(X)
-    n = len(Y)
-
-    # Initialize DP table with zeros
-    # dp[i][j] represents the length of LCS of X[0..i-1] and Y[0..j-1]
-    dp = [[0 for _ in range(n + 1)] for _ in range(m + 1)]
-
-    # Fill the DP table bottom-up
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if X[i-1] == Y[j-1]:
+    # Put the bit-vector over the longer sequence so the Python loop runs over the shorter
+    if len(X) < len(Y):
+        X, Y = Y, X
+
+    # Bit-parallel LCS (Allison-Dix): bit i of masks[c] is set where X[i] == c, and one
+    # DP row is held as the bits of a Python int, so each element of Y advances the whole
+    # row with a handful of big-int operations instead of len(X) comparisons
+    try:
+        masks = {}
+        for i, x in enumerate(X):
+            masks[x] = masks.get(x, 0) | 1 << i
+
+        row = 0
+        for y in Y:
+            matches = row | masks.get(y, 0)
+            row = matches & ((matches - ((row << 1) | 1)) ^ matches)
+    except TypeError:
+        # Unhashable elements cannot index the masks; use the row-by-row DP instead
+        return _lcs_length_rows(X, Y)
+
+    return bin(row).count('1')
+
+
+def _lcs_length_rows(X: Sequence[T], Y: Sequence[T]) -> int:
+    """LCS length by the classic DP over two rolling rows; works for any elements supporting ==."""
+    # Only the previous row is needed for the length, so keep two rows of
+    # len(Y) + 1 instead of the full (m+1) x (n+1) table; lcs_length passes
+    # the shorter sequence as Y. prev[j] is the LCS length of the rows so far
+    # and Y[0..j-1]
+    prev = [0] * (len(Y) + 1)
+
+    # Fill the rows top-down; walking Y alongside the diagonal and upper cells
+    # with zip avoids indexing three lists on every comparison
+    for x in X:
+        curr = [0]
+        left = 0
+        for y, diag, up in zip(Y, prev, prev[1:]):
+            if x == y:
                 # If current characters match, extend the LCS
-                dp[i][j] = dp[i-1][j-1] + 1
-            else:
+                left = diag + 1
+            elif up > left:
                 # Take the maximum from excluding either current character
-                dp[i][j] = max(dp[i-1][j], dp[i][j-1])
+                left = up
+            curr.append(left)
+        prev = curr
+
+    return prev[-1]
+
+
+def _lcs_table(X: Sequence[T], Y: Sequence[T]) -> List[List[int]]:
+    """
+    Builds the full LCS DP table shared by lcs_string and lcs_with_traceback.
+
+    dp[i][j] is the length of the LCS of X[0..i-1] and Y[0..j-1].
+    """
+    dp = [[0] * (len(Y) + 1)]
+
+    # Each row is built from the one above, as in _lcs_length_rows
+    for x in X:
+        prev = dp[-1]
+        curr = [0]
+        left = 0
+        for y, diag, up in zip(Y, prev, prev[1:]):
+            if x == y:
+                left = diag + 1
+            elif up > left:
+                left = up
+            curr.append(left)
+        dp.append(curr)
+
+    return dp
+
+
+def _lcs_backtrack(X: Sequence[T], Y: Sequence[T], dp: List[List[int]],
+                   traceback: Optional[List[List[str]]] = None) -> Union[str, List[T]]:
+    """
+    Reconstructs the LCS from a filled DP table, optionally marking the path in traceback.
+    """
+    lcs: List[T] = []
+    i, j = len(X), len(Y)
+
+    # Start from the bottom-right cell and move towards the top-left
+    while i > 0 and j > 0:
+        if X[i-1] == Y[j-1]:
+            # If characters match, this character is part of the LCS
+            lcs.append(X[i-1])
+            if traceback is not None:
+                traceback[i][j] = '↖'  # diagonal
+            i -= 1
+            j -= 1
+        elif dp[i-1][j] > dp[i][j-1]:
+            # If the value from the cell above is greater, move up
+            if traceback is not None:
+                traceback[i][j] = '↑'  # up
+            i -= 1
+        else:
+            # Otherwise, move left
+            if traceback is not None:
+                traceback[i][j] = '←'  # left
+            j -= 1
 
-    return dp[m][n]
+    # Reverse the LCS since we built it backwards
+    lcs.reverse()
+
+    # Return the appropriate type based on input types
+    if isinstance(X, str) and isinstance(Y, str):
+        return ''.join(lcs)
+    return lcs
 
 
 def lcs_string(X: Sequence[T], Y: Sequence[T]) -> Union[str, List[T]]:
@@ -86,43 +183,70 @@ def lcs_string(X: Sequence[T], Y: Sequence[T]) -> Union[str, List[T]]:
         >>> lcs_string("ABCBDAB", "BDCABA")
         'BCBA'  # The LCS is "BCBA"
     """
-    # Get sequence lengths
-    m = len(X)
-    n = len(Y)
-
-    # Initialize DP table with zeros
-    dp = [[0 for _ in range(n + 1)] for _ in range(m + 1)]
-
-    # Fill the DP table using the same logic as lcs_length
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if X[i-1] == Y[j-1]:
-                dp[i][j] = dp[i-1][j-1] + 1
-            else:
-                dp[i][j] = max(dp[i-1][j], dp[i][j-1])
+    # Count matching (i, j) pairs; when they are sparse, Hunt-Szymanski only visits
+    # those pairs instead of filling all m * n cells
+    try:
+        counts = Counter(Y)
+        matches = sum(counts[x] for x in X)
+    except TypeError:
+        # Unhashable elements can only be compared cell by cell
+        matches = None
+    if matches is not None and matches * SPARSE_MATCH_RATIO < len(X) * len(Y):
+        return lcs_hunt_szymanski(X, Y)
+
+    dp = _lcs_table(X, Y)
+    return _lcs_backtrack(X, Y, dp)
+
+
+def lcs_hunt_szymanski(X: Sequence[T], Y: Sequence[T]) -> Union[str, List[T]]:
+    """
+    Computes the Longest Common Subsequence with the Hunt-Szymanski algorithm.
 
-    # Backtrack to find the actual LCS
-    lcs: List[T] = []
-    i, j = m, n
+    Only the r pairs (i, j) with X[i] == Y[j] are visited, giving O((r + m) log n)
+    time, which is far below O(m*n) when few elements match. Elements must be hashable.
 
-    # Start from the bottom-right cell and move towards the top-left
-    while i > 0 and j > 0:
-        if X[i-1] == Y[j-1]:
-            # If characters match, this character is part of the LCS
-            lcs.append(X[i-1])
-            i -= 1
-            j -= 1
-        elif dp[i-1][j] > dp[i][j-1]:
-            # If the value from the cell above is greater, move up
-            i -= 1
-        else:
-            # Otherwise, move left
-            j -= 1
+    Args:
+        X: First sequence (string or list)
+        Y: Second sequence (string or list)
 
-    # Reverse the LCS since we built it backwards
+    Returns:
+        The longest common subsequence as a string (if inputs are strings)
+        or as a list (if inputs are lists)
+
+    Example:
+        >>> lcs_hunt_szymanski([1, 3, 5, 7, 9, 11], [1, 2, 3, 5, 8, 9, 10])
+        [1, 3, 5, 9]
+    """
+    # Positions of each element in Y, in ascending order
+    positions = {}
+    for j, y in enumerate(Y):
+        positions.setdefault(y, []).append(j)
+
+    # thresh[k] is the smallest j at which a common subsequence of length k + 1 ends,
+    # and links[k] is its last X index chained to the links entry it extends
+    thresh: List[int] = []
+    links: List[Tuple[int, Optional[tuple]]] = []
+
+    for i, x in enumerate(X):
+        # Descending j so one X[i] cannot extend a chain it just ended
+        for j in reversed(positions.get(x, ())):
+            k = bisect_left(thresh, j)
+            node = (i, links[k-1] if k else None)
+            if k == len(thresh):
+                thresh.append(j)
+                links.append(node)
+            else:
+                thresh[k] = j
+                links[k] = node
+
+    # Walk the chain from the longest subsequence back to its start
+    lcs: List[T] = []
+    node = links[-1] if links else None
+    while node is not None:
+        i, node = node
+        lcs.append(X[i])
     lcs.reverse()
 
-    # Return the appropriate type based on input types
     if isinstance(X, str) and isinstance(Y, str):
         return ''.join(lcs)
     return lcs
@@ -143,48 +267,13 @@ def lcs_with_traceback(X: Sequence[T], Y: Sequence[T]) -> Tuple[int, Union[str,
         - The DP table used for calculation
         - A traceback table showing the path used to construct the LCS
     """
-    m = len(X)
-    n = len(Y)
-
-    # Initialize DP table
-    dp = [[0 for _ in range(n + 1)] for _ in range(m + 1)]
-
-    # Fill the DP table
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if X[i-1] == Y[j-1]:
-                dp[i][j] = dp[i-1][j-1] + 1
-            else:
-                dp[i][j] = max(dp[i-1][j], dp[i][j-1])
+    dp = _lcs_table(X, Y)
 
-    # Create traceback
-    traceback = [[' ' for _ in range(n + 1)] for _ in range(m + 1)]
-
-    # Backtrack to find the LCS and mark the path
-    lcs = []
-    i, j = m, n
-    while i > 0 and j > 0:
-        if X[i-1] == Y[j-1]:
-            lcs.append(X[i-1])
-            traceback[i][j] = '↖'  # diagonal
-            i -= 1
-            j -= 1
-        elif dp[i-1][j] > dp[i][j-1]:
-            traceback[i][j] = '↑'  # up
-            i -= 1
-        else:
-            traceback[i][j] = '←'  # left
-            j -= 1
-
-    lcs.reverse()
-
-    # Convert to string if input was string
-    if isinstance(X, str) and isinstance(Y, str):
-        lcs_result = ''.join(lcs)
-    else:
-        lcs_result = lcs
+    # Create traceback, marked with the path while backtracking
+    traceback = [[' ' for _ in range(len(Y) + 1)] for _ in range(len(X) + 1)]
+    lcs_result = _lcs_backtrack(X, Y, dp, traceback)
 
-    return dp[m][n], lcs_result, dp, traceback
+    return dp[-1][-1], lcs_result, dp, traceback
 
 
 def print_lcs_traceback(X: Sequence[T], Y: Sequence[T], dp: List[List[int]], traceback: List[List[str]]) -> None: